@@ -3,14 +3,17 @@
 # Author: Jamal Mazrui, Consultant, Access Success LLC
 # License: MIT License
 
-import argparse, csv, logging, os, random, re, sys, urllib.parse
+import argparse, array, calendar, csv, importlib.util, itertools, logging, os, random, re, sys, urllib.parse
 from datetime import datetime
 from email.utils import parsedate_to_datetime
 
 import scrapy
 import toml
+from lxml import etree
 from scrapy.crawler import CrawlerProcess
+from scrapy.settings import Settings
 from scrapy.utils.log import configure_logging
+from scrapy.utils.response import get_base_url
 
 # Disable Scrapy’s default logging to the console.
 configure_logging(install_root_handler=False)
@@ -20,6 +23,43 @@ logging.getLogger("twisted").setLevel(logging.CRITICAL)
 # Global variable to hold our memory log handler (if --log is enabled)
 MEM_LOG_HANDLER = None
 
+# CSV output columns, and the number of buffered rows written to the file at a time.
+CSV_HEADER = ["url", "title", "linkCount", "controlCount", "byteCount", "updated"]
+CSV_BATCH_SIZE = 100
+
+# Characters that are not allowed in Windows file names, removed from the CSV and log file names.
+_SANITIZE_RE = re.compile(r'[\\\/:*?"<>|]')
+
+# Month names and abbreviations accepted by parseAndFormatDate (matching strptime's %B and %b).
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+}
+
+# One precompiled pattern covering the date shapes that parseAndFormatDate recognizes.
+# Times and UTC offsets are range-checked as strptime would check them (hour 0-23, minute and second 0-59).
+# re.ASCII keeps \d and \s to ASCII, as strptime's numeric fields are; other input falls back to strptime.
+_DATE_RE = re.compile(r"""
+    ^(?:
+        (?P<n1>\d{1,2})(?P<sep>[/-])(?P<n2>\d{1,2})(?P=sep)(?P<y1>\d{4})
+            # 3/18/2025, 03-18-2025, 18/03/2025, 18-03-2025
+      | (?P<y2>\d{4})-(?P<m2>\d{1,2})-(?P<d2>\d{1,2})
+        (?:T(?:[01]?\d|2[0-3]):[0-5]?\d:[0-5]?\d(?:Z|[+-](?:[01]\d|2[0-3]):?[0-5]\d))?
+            # 2025-03-18, 2025-03-18T12:34:56+0000, 2025-03-18T12:34:56Z
+      | (?:mon|tue|wed|thu|fri|sat|sun),\s+(?P<d3>\d{1,2})\s+(?P<mon3>[a-z]{3})\s+(?P<y3>\d{4})
+        \s+(?:[01]?\d|2[0-3]):[0-5]?\d:[0-5]?\d\s+(?:gmt|utc|[+-](?:[01]\d|2[0-3]):?[0-5]\d)
+            # Tue, 18 Mar 2025 00:00:00 GMT, Tue, 18 Mar 2025 00:00:00 +0000
+      | (?P<mon4>[a-z]+)\s+(?P<d4>\d{1,2}),\s+(?P<y4>\d{4})
+            # March 18, 2025, Mar 18, 2025
+    )$
+""", re.VERBOSE | re.IGNORECASE | re.ASCII)
+
+def isValidDate(iYear: int, iMonth: int, iDay: int) -> bool:
+    """Return True if the year, month, and day form a real calendar date."""
+    return iYear >= 1 and 1 <= iMonth <= 12 and 1 <= iDay <= calendar.monthrange(iYear, iMonth)[1]
+
 def parseAndFormatDate(sDate: str) -> str:
     """
     Attempt to parse a date string using several common formats and return it in YYYY-MM-DD format.
@@ -28,6 +68,26 @@ def parseAndFormatDate(sDate: str) -> str:
     sDate = sDate.strip()
     if not sDate:
         return ""
+    oMatch = _DATE_RE.match(sDate)
+    if oMatch:
+        lCandidates = []
+        if oMatch["y1"]:
+            iFirst, iSecond = int(oMatch["n1"]), int(oMatch["n2"])
+            # Month-first is preferred; day-first is tried only when that is not a valid date.
+            lCandidates = [(int(oMatch["y1"]), iFirst, iSecond), (int(oMatch["y1"]), iSecond, iFirst)]
+        elif oMatch["y2"]:
+            lCandidates = [(int(oMatch["y2"]), int(oMatch["m2"]), int(oMatch["d2"]))]
+        elif oMatch["y3"]:
+            iMonth = _MONTHS.get(oMatch["mon3"].lower(), 0)
+            lCandidates = [(int(oMatch["y3"]), iMonth, int(oMatch["d3"]))]
+        else:
+            iMonth = _MONTHS.get(oMatch["mon4"].lower(), 0)
+            lCandidates = [(int(oMatch["y4"]), iMonth, int(oMatch["d4"]))]
+        for iYear, iMonth, iDay in lCandidates:
+            # Years before 1000 are left to strftime, whose padding of %Y differs by platform.
+            if iYear >= 1000 and isValidDate(iYear, iMonth, iDay):
+                return f"{iYear:04d}-{iMonth:02d}-{iDay:02d}"
+    # Fall back to strptime for anything the pattern above does not resolve.
     lDateFormats = [
         "%m/%d/%Y",       # e.g., 3/18/2025
         "%m-%d-%Y",       # e.g., 03-18-2025
@@ -49,6 +109,107 @@ def parseAndFormatDate(sDate: str) -> str:
             continue
     return sDate  # Return the original value if no format matches.
 
+# HTML parser used for every page. Pages are never queried by id, so the id table is skipped.
+# Comments and processing instructions are kept: removing them merges the text nodes they split,
+# which would change titles such as <title>A<!--c-->B</title>.
+_HTML_PARSER = etree.HTMLParser(recover=True, encoding="utf8", huge_tree=True, collect_ids=False)
+
+def parseHtml(sText: str) -> etree._Element:
+    """
+    Parse decoded page text into an lxml root element with _HTML_PARSER.
+    Input is prepared as Scrapy's own selectors do, so an empty or unparseable page yields an empty <html> root.
+    """
+    bBody = sText.strip().replace("\x00", "").encode("utf8") or b"<html/>"
+    oRoot = etree.fromstring(bBody, parser=_HTML_PARSER)
+    if oRoot is None:
+        oRoot = etree.fromstring(b"<html/>", parser=_HTML_PARSER)
+    return oRoot
+
+# XPath expressions compiled once and evaluated against each page's lxml root.
+_XP_TITLE = etree.XPath("//title/text()", smart_strings=False)
+_XP_LINKS = etree.XPath("//a[@href]/@href", smart_strings=False)
+_XP_CONTROLS = etree.XPath("//*[(@role and normalize-space(@role) != '') or self::button or self::input or self::select or self::textarea]")
+_XP_META_DATES = etree.XPath("//meta[@content and (@name='last-modified' or @property='article:modified_time' or @name='last_modified' or @name='modified')]")
+# Meta keys consulted for the updated date, in order of preference.
+_META_DATE_KEYS = (("name", "last-modified"), ("property", "article:modified_time"), ("name", "last_modified"), ("name", "modified"))
+
+# Href features that urljoin normalizes or validates: parameters (;), bracketed hosts, and an empty query or fragment.
+_HREF_NEEDS_URLJOIN_RE = re.compile(r"[;\[\]]|\?#|[?#]$")
+# An absolute http(s) href with a non-empty host.
+_ABSOLUTE_HREF_RE = re.compile(r"https?://[^/?#]")
+# Links the crawler can follow; mailto:, tel:, javascript: and similar schemes are skipped.
+_HTTP_URL_RE = re.compile(r"https?://", re.IGNORECASE)
+
+def extractPageData(oRoot: etree._Element, sBaseUrl: str) -> tuple:
+    """
+    Extract the title, the set of absolute link URLs, and the control count from a parsed page.
+    Relative hrefs are resolved against sBaseUrl.
+    """
+    lTitles = _XP_TITLE(oRoot)
+    sTitle = lTitles[0] if lTitles else ""
+    # Absolute and root-relative hrefs (the common cases) are resolved without urljoin when that gives
+    # the same result. Non-ASCII or control characters, dot segments, the features matched by
+    # _HREF_NEEDS_URLJOIN_RE, and every other shape still go through urljoin.
+    oBase = urllib.parse.urlsplit(sBaseUrl)
+    sOrigin = f"{oBase.scheme}://{oBase.netloc}" if oBase.scheme in ("http", "https") and oBase.netloc else ""
+    urljoin = urllib.parse.urljoin
+    lHrefSet = set()
+    for sHref in _XP_LINKS(oRoot):
+        if sHref.isascii() and sHref.isprintable() and not _HREF_NEEDS_URLJOIN_RE.search(sHref):
+            if _ABSOLUTE_HREF_RE.match(sHref):
+                lHrefSet.add(sHref)
+                continue
+            if sOrigin and sHref.startswith("/") and not sHref.startswith("//") and "/." not in sHref:
+                lHrefSet.add(sOrigin + sHref)
+                continue
+        lHrefSet.add(urljoin(sBaseUrl, sHref))
+    iControlCount = len(_XP_CONTROLS(oRoot))
+    return sTitle, lHrefSet, iControlCount
+
+def extractMetaDates(oRoot: etree._Element) -> tuple:
+    """
+    Return the raw, non-empty content values of the page's date meta tags,
+    in the order of preference given by _META_DATE_KEYS.
+    """
+    # A single pass collects the first content value for each date key.
+    dMetaDates = {}
+    for oMeta in _XP_META_DATES(oRoot):
+        sContent = oMeta.get("content")
+        dMetaDates.setdefault(("name", oMeta.get("name")), sContent)
+        dMetaDates.setdefault(("property", oMeta.get("property")), sContent)
+    return tuple(sMeta for sMeta in map(dMetaDates.get, _META_DATE_KEYS) if sMeta)
+
+def resolveMetaDates(tMetaDates: tuple) -> str:
+    """Return the first meta date value that parseAndFormatDate turns into a non-empty string."""
+    for sMeta in tMetaDates:
+        sUpdatedDate = parseAndFormatDate(sMeta)
+        if sUpdatedDate:
+            return sUpdatedDate
+    return ""
+
+def parseHttpDate(bHttpDate: bytes) -> str:
+    """
+    Convert an HTTP date header value (e.g., b"Wed, 21 Oct 2015 07:28:00 GMT") to YYYY-MM-DD.
+    The fixed-length IMF-fixdate form is sliced directly; other forms go through parsedate_to_datetime.
+    Return an empty string if the value cannot be parsed.
+    """
+    # Every separator of the fixed form must be in place, and the weekday must be letters, before the fields are sliced out.
+    if (len(bHttpDate) == 29 and bHttpDate[:3].isalpha() and bHttpDate[3:5] == b", " and bHttpDate[25:] == b" GMT"
+            and bHttpDate[7:8] == bHttpDate[11:12] == bHttpDate[16:17] == b" "
+            and bHttpDate[19:20] == bHttpDate[22:23] == b":"):
+        bDay, bMonth, bYear = bHttpDate[5:7], bHttpDate[8:11], bHttpDate[12:16]
+        bHour, bMinute, bSecond = bHttpDate[17:19], bHttpDate[20:22], bHttpDate[23:25]
+        iMonth = _MONTHS.get(bMonth.decode("ascii", "replace").lower(), 0)
+        # The time must be a real time of day, as datetime requires.
+        bValidTime = (bHour + bMinute + bSecond).isdigit() and int(bHour) <= 23 and int(bMinute) <= 59 and int(bSecond) <= 59
+        # Years before 1000 are left to strftime, whose padding of %Y differs by platform.
+        if bValidTime and bDay.isdigit() and bYear.isdigit() and int(bYear) >= 1000 and isValidDate(int(bYear), iMonth, int(bDay)):
+            return f"{bYear.decode()}-{iMonth:02d}-{bDay.decode()}"
+    try:
+        return parsedate_to_datetime(bHttpDate.decode("utf-8")).strftime("%Y-%m-%d")
+    except Exception:
+        return ""
+
 class memoryLogHandler(logging.Handler):
     """A logging handler that stores log messages in memory."""
     def __init__(self) -> None:
@@ -63,9 +224,17 @@ class randomUserAgentMiddleware:
     Downloader middleware that sets a random User-Agent header for each request.
     It uses a default list of common user agents, and if the configuration provides
     a custom user agent, that value is added to the list.
+
+    Agents are drawn from a pre-shuffled, pre-encoded pool in which each agent appears
+    the same number of times, so each request only needs a single next() call.
     """
+    iPoolRepeat = 32  # copies of each agent in the shuffled pool
+
     def __init__(self, lUserAgents: list) -> None:
         self.lUserAgents = lUserAgents
+        lPool = [sAgent.encode("utf-8") for sAgent in lUserAgents] * self.iPoolRepeat
+        random.shuffle(lPool)
+        self.oUserAgentCycle = itertools.cycle(lPool)
 
     @classmethod
     def from_crawler(cls, crawler: scrapy.crawler.Crawler):
@@ -82,7 +251,7 @@ class randomUserAgentMiddleware:
         return cls(lDefaultAgents)
 
     def process_request(self, request: scrapy.http.Request, spider: scrapy.Spider) -> None:
-        request.headers["User-Agent"] = random.choice(self.lUserAgents)
+        request.headers["User-Agent"] = next(self.oUserAgentCycle)
 
 class spiderCustom(scrapy.Spider):
     """
@@ -103,13 +272,18 @@ class spiderCustom(scrapy.Spider):
     the page title is printed on a new line.
     """
     name = "spiderCustom"
+    # Settings that depend on the configuration (depth, robots.txt, custom user agent) are built in main().
     custom_settings = {
-        "DEPTH_LIMIT": 3,
         "DOWNLOAD_DELAY": 1,
         "RANDOMIZE_DOWNLOAD_DELAY": True,
         "DOWNLOADER_MIDDLEWARES": {
             "__main__.randomUserAgentMiddleware": 400,
         },
+        # Page data goes straight to the CSV buffer, so no items pass through Scrapy's pipeline or stats.
+        "ITEM_PIPELINES": {},
+        "EXTENSIONS": {
+            "scrapy.extensions.corestats.CoreStats": None,
+        },
     }
 
     def __init__(self, dConfigData: dict, *args: any, **kwargs: any) -> None:
@@ -118,16 +292,29 @@ class spiderCustom(scrapy.Spider):
         self.iMaxUrls = dConfigData.get("maxUrls", 30)
         self.iCrawlDepth = dConfigData.get("crawlDepth", 3)
         self.sParentDir = dConfigData.get("parentDir", "")
-        self.custom_settings["DEPTH_LIMIT"] = self.iCrawlDepth
-        self.custom_settings["ROBOTSTXT_OBEY"] = dConfigData.get("robotFilter", False)
-        if "userAgent" in dConfigData:
-            self.custom_settings["CUSTOM_USER_AGENT"] = dConfigData["userAgent"]
+        # Anchored pattern matching URLs whose path starts with the parent directory.
+        # The lookahead ensures the host is consumed in full before the directory is compared.
+        self.oParentDirRe = re.compile(rf"^[^:/?#]+://[^/?#]*(?![^/?#]){re.escape(self.sParentDir)}") if self.sParentDir else None
 
-        self.lItems = []         # list of dictionaries with page data
+        # Page data is streamed to a temporary CSV file, which closed() renames once the start title is known.
+        # Rows are buffered column by column and written with writerows in batches of CSV_BATCH_SIZE.
+        self.fCsv = None
+        self.csvWriter = None
+        self.sCsvTempFile = ""
+        self.iItemCount = 0
+        self.bCsvFailed = False  # set once a CSV write fails, so the output is not reported as complete
+        self.lUrls = []
+        self.lTitles = []
+        # Integer columns are packed arrays rather than lists of int objects.
+        self.lLinkCounts = array.array("I")
+        self.lControlCounts = array.array("I")
+        self.lByteCounts = array.array("Q")
+        self.lUpdatedDates = []
+        self.lMetaDates = []    # raw meta date values, parsed only when a batch is written
         self.sStartTitle = ""    # will store the title from the first processed page
 
-        # Always initialize the set of processed URLs.
-        self.lUrlSet = set()
+        # Always initialize the set of processed URLs, stored as string hashes to keep it small.
+        self.lUrlHashSet = set()
 
         # Determine if URL list mode is active.
         self.bUrlListMode = bool(dConfigData.get("urlList", "").strip())
@@ -145,92 +332,136 @@ class spiderCustom(scrapy.Spider):
     def startRequests(self) -> scrapy.Spider:
         if self.bUrlListMode:
             for sUrl in self.lUrlList:
-                if sUrl not in self.lUrlSet:
-                    self.lUrlSet.add(sUrl)
+                iUrlHash = hash(sUrl)
+                if iUrlHash not in self.lUrlHashSet:
+                    self.lUrlHashSet.add(iUrlHash)
                     yield scrapy.Request(url=sUrl, callback=self.parse, dont_filter=True)
         else:
-            if self.sStartUrl not in self.lUrlSet:
-                self.lUrlSet.add(self.sStartUrl)
+            self.lUrlHashSet.add(hash(self.sStartUrl))
             yield scrapy.Request(url=self.sStartUrl, callback=self.parse)
     start_requests = startRequests
 
-    def parse(self, response: scrapy.http.Response) -> any:
+    def parse(self, response: scrapy.http.Response) -> list:
         sUrl = response.url
-        sTitle = response.xpath("//title/text()").get() or ""
+        oRoot = parseHtml(response.text)
+        # Resolve the base URL (honoring any <base> tag) once rather than on every href.
+        sTitle, lHrefSet, iControlCount = extractPageData(oRoot, get_base_url(response))
         if not self.bUrlListMode and not self.bPrintedCrawlingMessage:
             print(f"Crawling {sUrl}")
             self.bPrintedCrawlingMessage = True
         if not self.sStartTitle:
             self.sStartTitle = sTitle
         print(sTitle)
-        lHrefSet = set()
-        for selector in response.xpath("//a[@href]"):
-            sHref = selector.xpath("./@href").get()
-            sAbsUrl = response.urljoin(sHref)
-            lHrefSet.add(sAbsUrl)
         iLinkCount = len(lHrefSet)
-        iControlCount = len(response.xpath("//*[(@role and normalize-space(@role) != '') or self::button or self::input or self::select or self::textarea]"))
         iByteCount = len(response.body)
         sUpdatedDate = ""
         if b"Last-Modified" in response.headers:
+            sUpdatedDate = parseHttpDate(response.headers[b"Last-Modified"])
+        # Meta tags are only consulted without a usable header; their values are parsed when the batch is written.
+        tMetaDates = () if sUpdatedDate else extractMetaDates(oRoot)
+        self.addCsvRow(sUrl, sTitle, iLinkCount, iControlCount, iByteCount, sUpdatedDate, tMetaDates)
+        if self.bUrlListMode:
+            return []
+        lUrlHashSet = self.lUrlHashSet
+        oParentDirRe = self.oParentDirRe
+        if len(lUrlHashSet) >= self.iMaxUrls:
+            logging.error(f"Reached maximum URL count: {self.iMaxUrls}")
+            return []
+        lRequests = []
+        lNextHashes = []
+        for sNextUrl in lHrefSet:
+            if not _HTTP_URL_RE.match(sNextUrl):
+                continue
+            if oParentDirRe and not oParentDirRe.match(sNextUrl):
+                continue
+            iUrlHash = hash(sNextUrl)
+            if iUrlHash in lUrlHashSet:
+                continue
             try:
-                dtLast = parsedate_to_datetime(response.headers[b"Last-Modified"].decode("utf-8"))
-                sUpdatedDate = dtLast.strftime("%Y-%m-%d")
-            except Exception:
-                sUpdatedDate = ""
-        if not sUpdatedDate:
-            sMeta = response.xpath("//meta[@name='last-modified']/@content").get() or ""
-            if sMeta:
-                sUpdatedDate = parseAndFormatDate(sMeta)
-            if not sUpdatedDate:
-                sMeta = response.xpath("//meta[@property='article:modified_time']/@content").get() or ""
-                if sMeta:
-                    sUpdatedDate = parseAndFormatDate(sMeta)
-            if not sUpdatedDate:
-                sMeta = response.xpath("//meta[@name='last_modified']/@content").get() or ""
-                if sMeta:
-                    sUpdatedDate = parseAndFormatDate(sMeta)
-            if not sUpdatedDate:
-                sMeta = response.xpath("//meta[@name='modified']/@content").get() or ""
-                if sMeta:
-                    sUpdatedDate = parseAndFormatDate(sMeta)
-        dItem = {
-            "url": sUrl,
-            "title": sTitle,
-            "linkCount": iLinkCount,
-            "controlCount": iControlCount,
-            "byteCount": iByteCount,
-            "updated": sUpdatedDate
-        }
-        self.lItems.append(dItem)
-        yield dItem
-        if not self.bUrlListMode:
-            if len(self.lUrlSet) < self.iMaxUrls:
-                for sNextUrl in lHrefSet:
-                    if self.sParentDir and not urllib.parse.urlparse(sNextUrl).path.startswith(self.sParentDir):
-                        continue
-                    if sNextUrl in self.lUrlSet:
-                        continue
-                    self.lUrlSet.add(sNextUrl)
-                    yield scrapy.Request(url=sNextUrl, callback=self.parse)
-            else:
-                logging.error(f"Reached maximum URL count: {self.iMaxUrls}")
+                lRequests.append(scrapy.Request(url=sNextUrl, callback=self.parse))
+            except ValueError as exc:
+                logging.error(f"Skipping invalid URL {sNextUrl}: {exc}")
+                continue
+            # Only URLs that were actually queued are marked as seen.
+            lNextHashes.append(iUrlHash)
+        lUrlHashSet.update(lNextHashes)
+        return lRequests
+
+    def openCsvFile(self) -> None:
+        """Open the temporary CSV file in the current directory and write the header row."""
+        # Exclusive creation with a plain open() keeps the umask-derived permissions of a normal output file.
+        sCsvRoot = f"getSiteLinks-{os.getpid()}"
+        self.sCsvTempFile = f"{sCsvRoot}.csv.tmp"
+        iSuffix = 1
+        while True:
+            try:
+                self.fCsv = open(self.sCsvTempFile, "x", newline="", encoding="utf-8-sig")
+                break
+            except FileExistsError:
+                self.sCsvTempFile = f"{sCsvRoot}-{iSuffix:02d}.csv.tmp"
+                iSuffix += 1
+        self.csvWriter = csv.writer(self.fCsv)
+        self.csvWriter.writerow(CSV_HEADER)
+
+    def addCsvRow(self, sUrl: str, sTitle: str, iLinkCount: int, iControlCount: int, iByteCount: int, sUpdatedDate: str, tMetaDates: tuple) -> None:
+        """
+        Buffer one page's data, writing the buffer to the CSV file once a batch is full.
+        If sUpdatedDate is empty, the updated date is resolved from tMetaDates at write time.
+        """
+        self.lUrls.append(sUrl)
+        self.lTitles.append(sTitle)
+        self.lLinkCounts.append(iLinkCount)
+        self.lControlCounts.append(iControlCount)
+        self.lByteCounts.append(iByteCount)
+        self.lUpdatedDates.append(sUpdatedDate)
+        self.lMetaDates.append(tMetaDates)
+        if len(self.lUrls) >= CSV_BATCH_SIZE:
+            self.flushCsvRows()
+
+    def flushCsvRows(self) -> None:
+        """Write all buffered rows to the CSV file, opening it on first use, and clear the buffer."""
+        if not self.lUrls:
+            return
+        # After a failed write the file is incomplete, so later batches are dropped rather than appended.
+        if not self.bCsvFailed:
+            try:
+                if self.csvWriter is None:
+                    self.openCsvFile()
+                lUpdatedDates = [sUpdatedDate or resolveMetaDates(tMetaDates) for sUpdatedDate, tMetaDates in zip(self.lUpdatedDates, self.lMetaDates)]
+                self.csvWriter.writerows(zip(self.lUrls, self.lTitles, self.lLinkCounts, self.lControlCounts, self.lByteCounts, lUpdatedDates))
+                self.iItemCount += len(self.lUrls)
+            except Exception as exc:
+                self.bCsvFailed = True
+                logging.error(f"Failed to write CSV rows: {exc}")
+        for lColumn in (self.lUrls, self.lTitles, self.lLinkCounts, self.lControlCounts, self.lByteCounts, self.lUpdatedDates, self.lMetaDates):
+            del lColumn[:]
 
     def closed(self, sReason: str) -> None:
         sRootName = self.sStartTitle.strip() if self.sStartTitle.strip() else "output"
-        sSanitized = re.sub(r'[\\\/:*?"<>|]', "", sRootName)
+        sSanitized = _SANITIZE_RE.sub("", sRootName)
         sCsvRoot = sSanitized
         sCsvFile = f"{sCsvRoot}.csv"
         iSuffix = 1
         while os.path.exists(sCsvFile):
             sCsvFile = f"{sCsvRoot}-{iSuffix:02d}.csv"
             iSuffix += 1
+        self.flushCsvRows()
+        if self.bCsvFailed:
+            # Leave the incomplete temporary file in place rather than presenting it as the CSV output.
+            if self.fCsv is None:
+                logging.error("Failed to write CSV file")
+                return
+            try:
+                self.fCsv.close()
+            except Exception:
+                pass
+            logging.error(f"Failed to write CSV file; incomplete output left in {self.sCsvTempFile}")
+            return
         try:
-            with open(sCsvFile, "w", newline="", encoding="utf-8-sig") as fCsv:
-                csvWriter = csv.DictWriter(fCsv, fieldnames=["url", "title", "linkCount", "controlCount", "byteCount", "updated"])
-                csvWriter.writeheader()
-                for dItem in self.lItems:
-                    csvWriter.writerow(dItem)
+            if self.fCsv is None:
+                self.openCsvFile()
+            self.fCsv.close()
+            os.replace(self.sCsvTempFile, sCsvFile)
         except Exception as exc:
             logging.error(f"Failed to write CSV file: {exc}")
             return
@@ -242,7 +473,7 @@ class spiderCustom(scrapy.Spider):
                         fLog.write(f"{sMsg}\n")
             except Exception as exc:
                 logging.error(f"Failed to write log file: {exc}")
-        print(f"Saved {len(self.lItems)} links to {sCsvFile}")
+        print(f"Saved {self.iItemCount} links to {sCsvFile}")
 
 def main() -> None:
     parser = argparse.ArgumentParser(
@@ -306,7 +537,18 @@ def main() -> None:
     if not dConfigData.get("log", False):
         logging.disable(logging.CRITICAL)
 
-    oCrawlerProcess = CrawlerProcess()
+    # Build the crawler settings once, before the crawler reads them.
+    # Scrapy runs on the asyncio reactor, backed by uvloop when it is installed (it is not available on Windows).
+    oSettings = Settings({
+        "TWISTED_REACTOR": "twisted.internet.asyncioreactor.AsyncioSelectorReactor",
+        "DEPTH_LIMIT": dConfigData.get("crawlDepth", 3),
+        "ROBOTSTXT_OBEY": dConfigData.get("robotFilter", False),
+    })
+    if importlib.util.find_spec("uvloop") is not None:
+        oSettings.set("ASYNCIO_EVENT_LOOP", "uvloop.Loop")
+    if "userAgent" in dConfigData:
+        oSettings.set("CUSTOM_USER_AGENT", dConfigData["userAgent"])
+    oCrawlerProcess = CrawlerProcess(settings=oSettings)
     oCrawlerProcess.crawl(spiderCustom, dConfigData=dConfigData)
     oCrawlerProcess.start()
 